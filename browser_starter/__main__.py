@@ -1,21 +1,23 @@
+from __future__ import annotations
+
 import asyncio
-import atexit
+import base64
+import concurrent.futures
+import contextlib
+import functools
 import json
 import os
 import platform
 import re
 import shutil
-import subprocess
 import sys
-import tempfile
-import threading
 import time
-import tomllib
+import types
 import webbrowser
-import winreg
 from logging import (
     DEBUG,
     INFO,
+    WARNING,
     Formatter,
     NullHandler,
     StreamHandler,
@@ -23,21 +25,92 @@ from logging import (
     handlers,
 )
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import click
-import yaml
+
+if TYPE_CHECKING:
+    import subprocess
+
+if sys.platform == "win32":
+    import winreg
+else:
+    winreg = None  # type: ignore
+
+try:
+    import orjson
+
+    _json_loads: Callable = orjson.loads
+except ImportError:  # orjson is optional
+    _json_loads = json.loads
+
+# OS name, which does not change during the process lifetime
+_SYSTEM = platform.system()
+# Path separator shown in the browser list
+_SLASH = os.sep
 
 # Location of configuration and log files
 ROOT_DIR = Path.home() / ".browser_starter"
 # Location of configuration file
 CONFIG_FILE = ROOT_DIR / "browser_starter.json"
+# Location of the installed browsers cache (Windows registry)
+BROWSERS_CACHE_FILE = ROOT_DIR / "browsers_cache.json"
+# Registry key under HKLM listing the installed browsers,
+# read in both the 64-bit and the 32-bit (WOW6432Node) views
+INSTALLED_BROWSERS_KEY = r"SOFTWARE\Clients\StartMenuInternet"
 # Time before the start page automatically closes
 DEFAULT_COUNTDOWN_SECONDS = 6
+# Maximum time to wait for a newly started browser to initialize
+BROWSER_INIT_SECONDS = 3
+# Interval between URLs in order keeping mode
+ORDERED_OPEN_INTERVAL_SECONDS = 0.5
+
+# Classifies the keys of a parameter file entry
+_PARAM_KEY_RE = re.compile(
+    r"^(?:"
+    r"(?P<name>(?:-bn|--browser-name)\d*$)"
+    r"|(?P<path>(?:-bp|--browser-path)\d*$)"
+    r"|(?P<url>-u|--urls)"
+    r"|(?P<mode>(?:-f|--fast|-o|--ordered)$)"
+    r")"
+)
+
+# Extracts the executable path from a registry shell command
+_EXE_RE = re.compile(r'"?([^"]+\.exe)"?')
+
+# Maximum number of URLs being opened at the same time
+MAX_CONCURRENT_OPENS = 8
 
+# Threads running the blocking registry and webbrowser calls
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_OPENS
+)
 # Browser name and its path on the PC
 REGISTERED_BROWSERS: Dict[str, str] = {}
 
+# Installed browser name and its path, detected once per process
+_INSTALLED_BROWSERS_CACHE: Optional[Dict[str, Optional[str]]] = None
+
+
+class LazyRotatingFileHandler(handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that creates the log directory on first open.
+    """
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 
 def log_setting(fileout: bool = True, stdout: bool = False):
     """Logging Settings
@@ -57,25 +130,36 @@ def log_setting(fileout: bool = True, stdout: bool = False):
         return logger
     else:
         logger.setLevel(DEBUG)
+        # Records are handled here only, skip the root logger handlers
+        logger.propagate = False
 
     formater = Formatter(
         "{asctime} {name} {levelname:<8s} {message}", style="{"
     )
 
     if fileout:
-        log_dir = ROOT_DIR / "log"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_file = log_dir / "browser_starter.log"
+        log_file = ROOT_DIR / "log" / "browser_starter.log"
 
-        rotating_file_handler = handlers.RotatingFileHandler(
+        # The log directory and file are created on the first record
+        rotating_file_handler = LazyRotatingFileHandler(
             filename=log_file,
             encoding="utf-8",
             maxBytes=1_000_000,
             backupCount=10,
+            delay=True,
         )
         rotating_file_handler.setLevel(DEBUG)
         rotating_file_handler.setFormatter(formater)
-        logger.addHandler(rotating_file_handler)
+
+        # Write records in batches, immediately from WARNING on.
+        # logging.shutdown flushes the rest at exit.
+        memory_handler = handlers.MemoryHandler(
+            capacity=1024,
+            flushLevel=WARNING,
+            target=rotating_file_handler,
+        )
+        memory_handler.setLevel(DEBUG)
+        logger.addHandler(memory_handler)
 
     if stdout:
         stream_handler = StreamHandler()
@@ -89,18 +173,25 @@ def log_setting(fileout: bool = True, stdout: bool = False):
 logger = log_setting()
 
 
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(path: str, mtime_ns: int) -> Dict:
+    """Parse a configuration file, once per path and modification time."""
+    # Text mode with the locale encoding, as the config has always been read
+    return _json_loads(Path(path).read_text())
+
+
 def load_config() -> Dict:
     """Load configuration from JSON file."""
     try:
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
+        mtime_ns = os.stat(CONFIG_FILE).st_mtime_ns
+        return _load_config_cached(str(CONFIG_FILE), mtime_ns)
 
     except FileNotFoundError:
         logger.warning(
             f"Config file {CONFIG_FILE} not found. Using default settings."
         )
 
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, UnicodeDecodeError):
         logger.error(f"Error decoding {CONFIG_FILE}. Using default settings.")
 
     return {}
@@ -112,16 +203,42 @@ CONFIG = load_config()
 def load_parameter_file(path: Path) -> Dict:
     parameter_file = path.absolute()
 
+    # Parsers are imported only for the format actually used
     suffix = parameter_file.suffix
     func: Callable
+    decode_errors: Tuple[type, ...]
     if suffix in (".yml", ".yaml"):
-        func = yaml.safe_load
+        import yaml
+
+        try:
+            from yaml import CSafeLoader as YamlLoader
+        except ImportError:  # PyYAML built without libyaml
+            from yaml import SafeLoader as YamlLoader  # type: ignore
+
+        def load_yaml(f):
+            data = f.read()
+            # JSON is a subset of YAML, and is much faster to parse
+            if data.lstrip()[:1] in (b"{", b"["):
+                try:
+                    return _json_loads(data)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass  # YAML flow style, not JSON
+
+            return yaml.load(data, Loader=YamlLoader)
+
+        func = load_yaml
+        decode_errors = (yaml.YAMLError,)
     elif suffix == ".json":
-        func = json.load
+        func = lambda f: _json_loads(f.read())  # noqa
+        decode_errors = (json.JSONDecodeError,)
     elif suffix == ".toml":
+        import tomllib
+
         func = tomllib.load
+        decode_errors = (tomllib.TOMLDecodeError,)
     else:
         func = lambda *a: None  # noqa
+        decode_errors = ()
 
     try:
         with open(parameter_file, "rb") as f:
@@ -130,13 +247,7 @@ def load_parameter_file(path: Path) -> Dict:
     except FileNotFoundError:
         logger.warning(f"Parameter file {parameter_file} not found.")
 
-    except yaml.YAMLError:
-        logger.error(f"Error decoding {parameter_file}.")
-
-    except json.JSONDecodeError:
-        logger.error(f"Error decoding {parameter_file}.")
-
-    except tomllib.TOMLDecodeError:
+    except decode_errors:
         logger.error(f"Error decoding {parameter_file}.")
 
     return {}
@@ -146,29 +257,33 @@ def run_with_parameter_file(p_file_path: Path):
     logger.info(f"Run with parameter file: {p_file_path}")
 
     parameter = load_parameter_file(p_file_path).items()
-    threads = []
+    entries = []
 
     for _, di in parameter:
+        # Classify the keys of the parameter file in a single pass
+        buckets: Dict[str, List] = {
+            "name": [],
+            "path": [],
+            "url": [],
+            "mode": [],
+        }
+        for key, value in di.items():
+            m = _PARAM_KEY_RE.match(key)
+            if m:
+                # The mode is given by the key itself, not by its value
+                buckets[m.lastgroup].append(  # type: ignore
+                    key if m.lastgroup == "mode" else value
+                )
+
         # Selecting a browser from the parameter file
         browsers = list()
 
-        # Extract browser name
-        pattern = r"^(-bn|--browser-name)\d*$"
-        matching_items = [
-            value for key, value in di.items() if re.match(pattern, key)
-        ]
-        if matching_items:
-            browsers.extend(matching_items)
+        # Browser name
+        browsers.extend(buckets["name"])
 
-        # Extract browser path
-        pattern = r"^(-bp|--browser-path)\d*$"
-        matching_items = [
-            value for key, value in di.items() if re.match(pattern, key)
-        ]
-        if matching_items:
-            for path in matching_items:
-                register_browser(path, path)
-            browsers.extend(matching_items)
+        # Browser path
+        register_browsers((path, path) for path in buckets["path"])
+        browsers.extend(buckets["path"])
 
         # If no browser is specified, get the default browser
         if not browsers:
@@ -179,62 +294,58 @@ def run_with_parameter_file(p_file_path: Path):
             else:
                 pass
 
-        # Get URL from parameter file
-        pattern = r"^(-u|--urls)"
-        matching_items = [
-            value for key, value in di.items() if re.match(pattern, key)
-        ]
+        # URL
         urls = [
             url
-            for item in matching_items
+            for item in buckets["url"]
             for url in (item if isinstance(item, list) else [item])
             if isinstance(url, str)
         ]
 
-        # Get fast mode from parameter file
-        pattern = r"^(-f|--fast|-o|--ordered)$"
-        matching_items = [
-            key for key, _ in di.items() if re.match(pattern, key)
-        ]
-        if matching_items:
-            if matching_items[0] in {"-f", "--fast"}:
-                fast = True
-            elif matching_items[0] in {"-o", "--ordered"}:
-                fast = False
-        else:
-            fast = False
+        # Fast mode; the first fast/ordered key takes precedence
+        fast = bool(buckets["mode"]) and buckets["mode"][0] in {"-f", "--fast"}
 
         logger.debug(
-            "Parameter file parameter; "
-            f"browsers: {browsers}, urls: {urls}, fast: {fast}"
-        )
-
-        t = threading.Thread(
-            target=async_run_main, args=[browsers, urls, fast]
+            "Parameter file parameter; browsers: %s, urls: %s, fast: %s",
+            browsers,
+            urls,
+            fast,
         )
-        threads.append(t)
 
-    for t in threads:
-        t.start()
+        entries.append((browsers, urls, fast))
 
-    for t in threads:
-        t.join()
+    if not asyncio.run(run_all(entries)):
+        sys.exit(1)
 
 
-def get_browser_path_windows(browser_name: str) -> Optional[str]:
+def get_browser_path_windows(
+    browser_name: str,
+    parent: Optional[Union[winreg.HKEYType, int]] = None,
+) -> Optional[str]:
     """
     Get browser path from Windows registry.
+
+    Args:
+        browser_name (str): Subkey name under StartMenuInternet.
+        parent (winreg.HKEYType | int, optional): Already opened
+            StartMenuInternet key to look up browser_name in.
+            Defaults to the one under HKEY_LOCAL_MACHINE.
     """
-    logger.debug(f"Attempting to get browser path for {browser_name}")
+    if winreg is None:
+        return None
+
+    logger.debug("Attempting to get browser path for %s", browser_name)
 
     try:
-        browser_key = rf"Software\Clients\StartMenuInternet\{browser_name}"
-        key_path = rf"{browser_key}\shell\open\command"
+        key_path = rf"{browser_name}\shell\open\command"
+        if parent is None:
+            parent = winreg.HKEY_LOCAL_MACHINE
+            key_path = rf"Software\Clients\StartMenuInternet\{key_path}"
 
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+        with winreg.OpenKey(parent, key_path) as key:
             command = winreg.QueryValueEx(key, "")[0]
             path = command.replace('"', "")
-            logger.debug(f"Browser path found: {path}")
+            logger.debug("Browser path found: %s", path)
 
             return path
 
@@ -244,10 +355,15 @@ def get_browser_path_windows(browser_name: str) -> Optional[str]:
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def get_default_browser_path_windows() -> Optional[str]:
     """
     Get default browser path from Windows registry.
     """
+    if winreg is None:
+        logger.debug("Default browser detection requires Windows")
+        return None
+
     try:
         logger.debug("Attempting to get default browser path")
 
@@ -257,23 +373,26 @@ def get_default_browser_path_windows() -> Optional[str]:
         # Get the ProgID from the user settings that open the Https link.
         with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path) as key:
             progid = winreg.QueryValueEx(key, "ProgID")[0]
-        logger.debug(f"Default browser ProgID: {progid}")
+        logger.debug("Default browser ProgID: %s", progid)
 
         key_path = rf"{progid}\shell\open\command"
 
         # Get software path from ProgID
         with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, key_path) as key:
             command = winreg.QueryValueEx(key, "")[0]
-            match = re.search(r'"?([^"]+\.exe)"?', command)
-            logger.debug(
-                f"Default browser path found: "
-                f"{match.group(1) if match else None}"
-            )
 
+        path: Optional[str] = None
+        # Usually the command starts with the quoted executable path
+        end = command.find('"', 1) if command.startswith('"') else -1
+        if end > 0 and command[1:end].endswith(".exe"):
+            path = command[1:end]
+        else:
+            match = _EXE_RE.search(command)
             if match:
-                return match.group(1)
-            else:
-                return None
+                path = match.group(1)
+        logger.debug("Default browser path found: %s", path)
+
+        return path
 
     except WindowsError as e:
         logger.error(f"Error getting default browser path: {e}")
@@ -281,33 +400,200 @@ def get_default_browser_path_windows() -> Optional[str]:
         return None
 
 
+def _is_cacheable_browser_path(path: object) -> bool:
+    """
+    Check whether a browser path points at an existing executable,
+    the same rule for saving and loading the browsers cache.
+    """
+    return isinstance(path, str) and os.path.isfile(path)
+
+
+def _load_browser_cache(
+    last_write_times: List[int],
+) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Load installed browsers from the cache file.
+    Returns None if the cache is missing, the registry has changed or
+    a cached browser executable no longer exists.
+    """
+    try:
+        with open(BROWSERS_CACHE_FILE, "rb") as f:
+            cache = _json_loads(f.read())
+
+    except FileNotFoundError:
+        logger.debug("Browsers cache not found")
+        return None
+
+    # e.g. locked while another instance replaces it
+    except OSError as e:
+        logger.warning(f"Error reading {BROWSERS_CACHE_FILE}: {e}. Ignoring.")
+        return None
+
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.warning(f"Error decoding {BROWSERS_CACHE_FILE}. Ignoring.")
+        return None
+
+    if not isinstance(cache, dict):
+        return None
+
+    if cache.get("last_write_time") != last_write_times:
+        logger.debug("Browsers cache is outdated")
+        return None
+
+    browsers = cache.get("browsers")
+    if not isinstance(browsers, dict):
+        return None
+
+    # Changes below the StartMenuInternet subkeys, such as a browser
+    # reinstalled elsewhere, do not update the LastWriteTime
+    for name, path in browsers.items():
+        if not _is_cacheable_browser_path(path):
+            logger.debug("Browsers cache is stale for %s: %s", name, path)
+            return None
+
+    logger.debug("Browsers cache hit: %s", browsers)
+
+    return browsers
+
+
+def _save_browser_cache(
+    last_write_times: List[int], browsers: Dict[str, Optional[str]]
+) -> None:
+    """
+    Write installed browsers to the cache file atomically.
+    Browsers whose executable could not be found are not cached,
+    so that they are looked up again next time.
+    """
+    if not all(map(_is_cacheable_browser_path, browsers.values())):
+        logger.debug("Browsers cache not saved, some paths are missing")
+        return
+
+    cache = {"last_write_time": last_write_times, "browsers": browsers}
+
+    import tempfile
+
+    temp_file_name: Optional[str] = None
+    try:
+        ROOT_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            delete=False,
+            dir=ROOT_DIR,
+            prefix=BROWSERS_CACHE_FILE.name,
+            suffix=".tmp",
+            encoding="utf-8",
+        ) as f:
+            temp_file_name = f.name
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(temp_file_name, BROWSERS_CACHE_FILE)
+        logger.debug("Saved browsers cache: %s", BROWSERS_CACHE_FILE)
+
+    except OSError as e:
+        logger.error(f"Error writing {BROWSERS_CACHE_FILE}: {e}")
+        # Do not leave the temporary file behind in ROOT_DIR
+        if temp_file_name is not None:
+            with contextlib.suppress(OSError):
+                os.remove(temp_file_name)
+
+
 def get_installed_browsers() -> Dict[str, Optional[str]]:
     """
     Get installed browsers based on the operating system.
+    Browsers are detected once per process,
+    use refresh_installed_browsers() to detect them again.
     """
-    system = platform.system()
-    logger.info(f"Detecting installed browsers on {system}")
+    global _INSTALLED_BROWSERS_CACHE
 
-    browsers: Dict[str, Optional[str]] = {}
+    if _INSTALLED_BROWSERS_CACHE is None:
+        _INSTALLED_BROWSERS_CACHE = detect_installed_browsers()
 
-    if system == "Windows":
-        keys = [
-            r"SOFTWARE\Clients\StartMenuInternet",
-            r"SOFTWARE\WOW6432Node\Clients\StartMenuInternet",
-        ]
-        for key in keys:
-            try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key) as reg_key:
-                    for i in range(winreg.QueryInfoKey(reg_key)[0]):
-                        name = winreg.EnumKey(reg_key, i)
-                        browsers[name] = get_browser_path_windows(name)
+    return _INSTALLED_BROWSERS_CACHE
+
+
+def refresh_installed_browsers() -> Dict[str, Optional[str]]:
+    """
+    Discard the detected browsers and detect them again,
+    bypassing the browsers cache file.
+    """
+    global _INSTALLED_BROWSERS_CACHE
+
+    _INSTALLED_BROWSERS_CACHE = detect_installed_browsers(use_file_cache=False)
 
-            except WindowsError as e:
-                logger.error(f"Error accessing registry key {key}: {e}")
+    return _INSTALLED_BROWSERS_CACHE
 
-        browsers = dict(sorted(browsers.items()))
 
-    elif system == "Linux":
+def detect_installed_browsers(
+    use_file_cache: bool = True,
+) -> Dict[str, Optional[str]]:
+    """
+    Detect installed browsers based on the operating system.
+
+    Args:
+        use_file_cache (bool, optional): Reuse the browsers cache file
+            while the registry is unchanged (Windows). Defaults to True.
+    """
+    logger.info(f"Detecting installed browsers on {_SYSTEM}")
+
+    browsers: Dict[str, Optional[str]] = {}
+
+    if _SYSTEM == "Windows" and winreg is not None:
+        views = {
+            "64-bit": winreg.KEY_WOW64_64KEY,
+            "32-bit": winreg.KEY_WOW64_32KEY,
+        }
+        with contextlib.ExitStack() as stack:
+            # Each view is opened once, for both the cache check and the walk
+            reg_keys: List[Optional[winreg.HKEYType]] = []
+            for view_name, view in views.items():
+                try:
+                    reg_key = winreg.OpenKeyEx(
+                        winreg.HKEY_LOCAL_MACHINE,
+                        INSTALLED_BROWSERS_KEY,
+                        0,
+                        winreg.KEY_READ | view,
+                    )
+                    reg_keys.append(stack.enter_context(reg_key))
+
+                except WindowsError as e:
+                    logger.error(
+                        "Error accessing registry key "
+                        f"{INSTALLED_BROWSERS_KEY} ({view_name}): {e}"
+                    )
+                    reg_keys.append(None)
+
+            # Missing views are recorded as well, so that they invalidate
+            # the cache when they appear
+            last_write_times = [
+                winreg.QueryInfoKey(reg_key)[2] if reg_key is not None else 0
+                for reg_key in reg_keys
+            ]
+
+            if use_file_cache:
+                cached_browsers = _load_browser_cache(last_write_times)
+                if cached_browsers is not None:
+                    return cached_browsers
+
+            # Browser name and the view it is found in, 64-bit first
+            parents: Dict[str, winreg.HKEYType] = {}
+            for view_key in reg_keys:
+                if view_key is None:
+                    continue
+
+                for i in range(winreg.QueryInfoKey(view_key)[0]):
+                    parents.setdefault(winreg.EnumKey(view_key, i), view_key)
+
+            # Look up the paths in parallel, winreg releases the GIL
+            paths = _EXECUTOR.map(
+                get_browser_path_windows, parents.keys(), parents.values()
+            )
+            # Consumed while the keys are still open
+            browsers.update(zip(parents, paths))
+
+        # Registry order is not guaranteed to be alphabetical across views
+        browsers = {name: browsers[name] for name in sorted(browsers)}
+        _save_browser_cache(last_write_times, browsers)
+
+    elif _SYSTEM == "Linux":
         common_browsers = [
             "firefox",
             "google-chrome",
@@ -323,14 +609,14 @@ def get_installed_browsers() -> Dict[str, Optional[str]]:
             if shutil.which(browser)
         }
 
-    elif system == "Darwin":  # macOS
+    elif _SYSTEM == "Darwin":  # macOS
         # TODO: Implement macOS browser detection here
         logger.warning("macOS browser detection not implemented yet.")
 
     else:
-        logger.warning(f"Unsupported operating system: {system}")
+        logger.warning(f"Unsupported operating system: {_SYSTEM}")
 
-    logger.debug(f"Detected browsers: {browsers}")
+    logger.debug("Detected browsers: %r", browsers)
 
     return browsers
 
@@ -339,87 +625,254 @@ def register_browser(name: str, path: str) -> None:
     """
     Register a browser.
     """
-    logger.info(f"Registering browser: {name} at path: {path}")
+    register_browsers([(name, path)])
 
-    try:
-        webbrowser.register(name, None, webbrowser.BackgroundBrowser(path))
-        REGISTERED_BROWSERS[name] = path
 
-    except Exception as e:
-        logger.error(f"Error registering browser {name}: {e}")
+def register_browsers(items: Iterable[Tuple[str, str]]) -> None:
+    """
+    Register multiple browsers under a single acquisition of the
+    webbrowser lock.
+    Equivalent to webbrowser.register(name, None, BackgroundBrowser(path))
+    for each (name, path).
+    """
+    with webbrowser._lock:  # type: ignore
+        if webbrowser._tryorder is None:  # type: ignore
+            webbrowser.register_standard_browsers()
+
+        for name, path in items:
+            logger.info(f"Registering browser: {name} at path: {path}")
+
+            try:
+                webbrowser._browsers[name.lower()] = [  # type: ignore
+                    None,
+                    webbrowser.BackgroundBrowser(path),
+                ]
+                webbrowser._tryorder.append(name)  # type: ignore
+                REGISTERED_BROWSERS[name] = path
+
+            except Exception as e:
+                logger.error(f"Error registering browser {name}: {e}")
 
 
 def register_all_installed_browsers() -> None:
     """
     Register all installed browsers.
     """
-    for name, path in get_installed_browsers().items():
-        if path:
-            register_browser(name, path)
+    register_browsers(
+        (name, path) for name, path in get_installed_browsers().items() if path
+    )
 
 
-async def open_url(browser: webbrowser.BaseBrowser, url: str) -> None:
+def _has_browser_window(pid: int) -> bool:
     """
-    Open a URL asynchronously.
+    Check whether the process has a visible top-level window.
+    Always False except on Windows.
     """
-    success = browser.open(url, new=2)  # new=2 specifies opening in a new tab
-    logger.info(f"Opening URL: {url} - Success: {success}")
+    if _SYSTEM != "Windows":
+        return False
 
-    await asyncio.sleep(0.5)
+    import ctypes
+    from ctypes import wintypes
 
+    user32 = ctypes.windll.user32  # type: ignore
+    # Without prototypes, HWNDs are converted as C int and may overflow
+    user32.GetWindowThreadProcessId.argtypes = [
+        wintypes.HWND,
+        ctypes.POINTER(wintypes.DWORD),
+    ]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsWindowVisible.restype = wintypes.BOOL
+    found = False
 
-async def open_urls_in_browser(
-    browsername: str, urls: List[str], open_strategy: Callable
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _):
+        nonlocal found
+        window_pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(window_pid))
+        if window_pid.value == pid and user32.IsWindowVisible(hwnd):
+            found = True
+            return False  # Stop enumerating
+
+        return True
+
+    user32.EnumWindows(callback, 0)
+
+    return found
+
+
+async def wait_for_browser_ready(
+    process: subprocess.Popen, timeout: float = BROWSER_INIT_SECONDS
 ) -> None:
     """
-    Open multiple URLs in the specified browser using the given strategy.
+    Wait until the started browser shows a window, with exponential backoff.
+    If the process exits, an already running instance took over
+    the request and is ready.
+    Gives up after timeout seconds.
     """
-    browser = webbrowser.get(browsername)
-    browserpath = REGISTERED_BROWSERS[browsername]
-    logger.debug(f"Browser path: {browserpath}")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interval = 0.1
 
-    logger.info(f"Opening URLs in {browsername}")
+    while (remaining := deadline - loop.time()) > 0:
+        await asyncio.sleep(min(interval, remaining))
+
+        if process.poll() is not None:
+            logger.debug("Browser process exited: %s", process.returncode)
+            return
+
+        if _has_browser_window(process.pid):
+            logger.debug("Browser window found for PID: %s", process.pid)
+            return
+
+        interval = min(interval * 1.5, 0.5)
 
-    start_page = get_start_page()
-    logger.debug(f"Start page URL: {start_page}")
+    logger.debug("Browser readiness timed out after %s seconds", timeout)
 
+
+def start_browser_process(
+    browserpath: str, start_page: str
+) -> subprocess.Popen:
+    """
+    Start the browser with a new window showing the start page.
+    """
+    import subprocess
+
+    # Start the browser detached, without inheriting handles
+    creationflags = 0
+    if _SYSTEM == "Windows":
+        creationflags = (
+            subprocess.DETACHED_PROCESS  # type: ignore
+            | subprocess.CREATE_NEW_PROCESS_GROUP  # type: ignore
+        )
     process = subprocess.Popen(
-        [browserpath, "--new-window", start_page], shell=True  # type: ignore
+        [browserpath, "--new-window", start_page],
+        creationflags=creationflags,
+        close_fds=True,
     )
     logger.info(f"Started browser process with PID: {process.pid}")
 
-    await asyncio.sleep(3)  # Wait for the browser to initialize
+    return process
+
+
+class BrowserPool:
+    """
+    Browsers started ahead of opening URLs, one process per browser name.
+    """
+
+    def __init__(self, start_page: str, browsers: Mapping[str, str]) -> None:
+        """
+        Args:
+            start_page (str): URI shown in the new browser windows.
+            browsers (Mapping[str, str]): Browser name and its path.
+        """
+        self.start_page = start_page
+        self.browsers = browsers
+        # Bounds the URLs being opened. Created per pool, since a
+        # semaphore binds to the event loop it is first used in.
+        self.open_semaphore = asyncio.Semaphore(MAX_CONCURRENT_OPENS)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def prewarm(self, browsernames: Iterable[str]) -> None:
+        """
+        Start the browsers concurrently in the running event loop.
+        """
+        for browsername in browsernames:
+            if browsername not in self._tasks:
+                self._tasks[browsername] = asyncio.create_task(
+                    self._start(browsername)
+                )
+
+    async def _start(
+        self, browsername: str
+    ) -> Tuple[subprocess.Popen, webbrowser.BaseBrowser]:
+        browserpath = self.browsers[browsername]
+        # Resolved before starting, so an unknown browser starts nothing
+        browser = webbrowser.get(browsername)
+
+        process = await asyncio.to_thread(
+            start_browser_process, browserpath, self.start_page
+        )
+        await wait_for_browser_ready(process)
+
+        return process, browser
+
+    async def acquire(
+        self, browsername: str
+    ) -> Tuple[subprocess.Popen, webbrowser.BaseBrowser]:
+        """
+        Wait until the browser is ready and return its process and
+        webbrowser controller.
+        The browser is started if it has not been prewarmed.
+        """
+        self.prewarm([browsername])
 
-    await open_strategy(browser, urls)
+        return await self._tasks[browsername]
+
+
+async def open_url(
+    browser: webbrowser.BaseBrowser, url: str, semaphore: asyncio.Semaphore
+) -> None:
+    """
+    Open a URL asynchronously, while holding the semaphore.
+    """
+    loop = asyncio.get_running_loop()
+    async with semaphore:
+        # browser.open blocks until the browser process is spawned
+        success = await loop.run_in_executor(
+            _EXECUTOR, browser.open, url, 2  # 2: open in a new tab
+        )
+    logger.info(f"Opening URL: {url} - Success: {success}")
+
+
+async def open_urls_in_browser(
+    browsername: str,
+    urls: List[str],
+    open_strategy: Callable,
+    pool: BrowserPool,
+) -> None:
+    """
+    Open multiple URLs in the specified browser using the given strategy.
+    """
+    logger.debug("Browser path: %s", pool.browsers.get(browsername))
+
+    # Wait for the browser started by the pool to initialize
+    _, browser = await pool.acquire(browsername)
+
+    logger.info(f"Opening URLs in {browsername}")
+
+    await open_strategy(browser, urls, pool.open_semaphore)
 
 
 async def open_urls_fast(
-    browser: webbrowser.BaseBrowser, urls: List[str]
+    browser: webbrowser.BaseBrowser,
+    urls: List[str],
+    semaphore: asyncio.Semaphore,
 ) -> None:
     """
     Open URLs asynchronously in parallel (fast mode).
     """
-    tasks = [open_url(browser, url) for url in urls]
+    tasks = [open_url(browser, url, semaphore) for url in urls]
     await asyncio.gather(*tasks)
 
 
 async def open_urls_ordered(
-    browser: webbrowser.BaseBrowser, urls: List[str]
+    browser: webbrowser.BaseBrowser,
+    urls: List[str],
+    semaphore: asyncio.Semaphore,
 ) -> None:
     """
     Open URLs asynchronously in order (ordered mode).
     """
-    for url in urls:
-        await open_url(browser, url)
+    for i, url in enumerate(urls):
+        # Give the browser time to add the tab before the next one
+        if i:
+            await asyncio.sleep(ORDERED_OPEN_INTERVAL_SECONDS)
+        await open_url(browser, url, semaphore)
 
 
-def get_start_page(
-    countdown_seconds: int = DEFAULT_COUNTDOWN_SECONDS,
-) -> Optional[str]:
-    """
-    Generate a temporary start page with a countdown timer.
-    """
-    html_content = f"""
+# Start page HTML, formatted with countdown_seconds
+_START_PAGE_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="ja">
     <head>
@@ -451,35 +904,42 @@ def get_start_page(
     </html>
     """
 
-    try:
-        with tempfile.NamedTemporaryFile(
-            "w", delete=False, suffix=".html", encoding="utf-8"
-        ) as f:
-            f.write(html_content)
-            temp_file_name = f.name
-        logger.debug(f"Created temporary start page: {temp_file_name}")
-
-        atexit.register(lambda: os.remove(temp_file_name))
 
-        return Path(temp_file_name).absolute().as_uri()
-    except IOError as e:
-        logger.error(f"Error creating temporary file: {e}")
+@functools.lru_cache(maxsize=None)
+def get_start_page(
+    countdown_seconds: int = DEFAULT_COUNTDOWN_SECONDS,
+) -> str:
+    """
+    Generate a start page with a countdown timer as a data: URI.
+    The page is rendered once per countdown_seconds and reused.
+    """
+    html_content = _START_PAGE_TEMPLATE.format(
+        countdown_seconds=countdown_seconds
+    )
+    payload = base64.b64encode(html_content.encode("utf-8")).decode("ascii")
 
-        return None
+    return f"data:text/html;charset=utf-8;base64,{payload}"
 
 
-def display_registered_browsers():
+def display_registered_browsers(browsers: Optional[Dict[str, str]] = None):
     """
     Registered Name |> Path
+    Displays REGISTERED_BROWSERS unless browsers is given.
     """
-    if not REGISTERED_BROWSERS:
+    if browsers is None:
+        browsers = REGISTERED_BROWSERS
+
+    if not browsers:
         click.echo("No browsers registered.")
         return
 
-    click.echo("Browser list")
-    items = REGISTERED_BROWSERS.items()
-    max_key = max(len(item[0]) for item in items)
-    max_value = max(len(item[1]) for item in items)
+    items = browsers.items()
+    max_key, max_value = 0, 0
+    for key, value in items:
+        if len(key) > max_key:
+            max_key = len(key)
+        if len(value) > max_value:
+            max_value = len(value)
 
     # Consider the length of column names as well
     BROWSER_NAME_COLUMN = "browser-name"
@@ -487,53 +947,99 @@ def display_registered_browsers():
     max_key = max(max_key, len(BROWSER_NAME_COLUMN))
     max_value = max(max_value, len(BROWSER_PATH_COLUMN))
 
-    slash = "\\" if platform.system() == "Windows" else "/"
+    # Build the whole table and display it at once
+    out: List[str] = ["Browser list"]
 
-    # Display the header
-    click.echo(f"  {BROWSER_NAME_COLUMN:<{max_key}} |>  ", nl=False)
-    click.echo(f"{BROWSER_PATH_COLUMN.replace('/', slash)}")
-    click.echo("-" * (max_key + max_value + 10))
+    # Header
+    out.append(
+        f"  {BROWSER_NAME_COLUMN:<{max_key}} |>  "
+        f"{BROWSER_PATH_COLUMN.replace('/', _SLASH)}"
+    )
+    out.append("-" * (max_key + max_value + 10))
 
-    # Display browser information
+    # Browser information
     for key, value in items:
-        click.echo(f"  {key:<{max_key}} |>  {value}")
+        out.append(f"  {key:<{max_key}} |>  {value}")
+
+    click.echo("\n".join(out))
 
 
 def async_run_main(
     browsernames: List[str], urls: List[str], fast_mode: bool = True
 ):
-    asyncio.run(main(browsernames, urls, fast_mode))
+    if not asyncio.run(main(browsernames, urls, fast_mode)):
+        sys.exit(1)
+
+
+async def run_all(entries: List[Tuple[List[str], List[str], bool]]) -> bool:
+    """
+    Run main for each (browsernames, urls, fast_mode) on a single event loop.
+    Returns False if any browser failed.
+    """
+    results = await asyncio.gather(*(main(b, u, f) for b, u, f in entries))
+
+    return all(results)
 
 
 async def main(
     browsernames: List[str], urls: List[str], fast_mode: bool = True
-) -> None:
+) -> bool:
     """
     Main asynchronous function to open URLs in specified browsers.
+    Returns False if any browser failed.
     """
-    start_time = time.perf_counter()
+    # The execution time is only measured when it is logged
+    measure = logger.isEnabledFor(INFO)
+    if measure:
+        start_time = time.perf_counter()
+
+    # Registration is finished, tasks share a read-only snapshot
+    browsers = types.MappingProxyType(dict(REGISTERED_BROWSERS))
+
+    # Start every browser before opening URLs in any of them,
+    # all showing the same start page
+    pool = BrowserPool(get_start_page(), browsers)
+    pool.prewarm(browsernames)
 
     open_strategy = open_urls_fast if fast_mode else open_urls_ordered
     tasks = [
-        open_urls_in_browser(browsername, urls, open_strategy)
+        open_urls_in_browser(browsername, urls, open_strategy, pool)
         for browsername in browsernames
     ]
-    logger.info(f"Starting main function with browsers: {browsernames}")
-    logger.info(f"URLs to open: {urls}")
-    logger.info(f"Fast mode: {fast_mode}")
-    logger.debug(f"Registered browsers: {REGISTERED_BROWSERS}")
-    logger.debug(
-        f"Webbrowser browsers: {webbrowser._browsers}"  # type: ignore
-    )
+    logger.info("Starting main function with browsers: %s", browsernames)
+    logger.info("URLs to open: %s", urls)
+    logger.info("Fast mode: %s", fast_mode)
+    if logger.isEnabledFor(DEBUG):
+        logger.debug("Registered browsers: %r", browsers)
+        logger.debug(
+            "Webbrowser browsers: %r", webbrowser._browsers  # type: ignore
+        )
 
+    succeeded = True
     try:
-        await asyncio.gather(*tasks)
+        # A failing browser must not cut the other browsers short
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for browsername, result in zip(browsernames, results):
+            # BaseException, so that a cancelled browser is reported too
+            if isinstance(result, BaseException):
+                succeeded = False
+                logger.error(
+                    f"Error opening URLs in {browsername}: {result!r}",
+                    exc_info=result,
+                )
+                click.echo(
+                    f"Error: Could not open URLs in {browsername}: {result!r}",
+                    err=True,
+                )
     except asyncio.CancelledError as e:
+        succeeded = False
         logger.warning("Main function cancelled:", exc_info=e)
     finally:
-        end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
-        logger.info(f"Total execution time: {elapsed_time:.4f} seconds")
+        if measure:
+            elapsed_time = time.perf_counter() - start_time
+            logger.info("Total execution time: %.4f seconds", elapsed_time)
+
+    return succeeded
 
 
 @click.command(context_settings=dict(help_option_names=["-h", "--help"]))
@@ -581,19 +1087,28 @@ def cli(browser_name, browser_path, p_file, fast, browser_list, urls, urls_):
     """Open URLs in specified browser.
     If no URLs are provided, only the start page will be opened."""
     logger.info("Starting CLI")
-    logger.debug(f"Command line arguments: {sys.argv}")
+    logger.debug("Command line arguments: %s", sys.argv)
 
     # Display help when no argument is given
     if len(sys.argv) == 1:
         cli.main(["--help"])
 
-    register_all_installed_browsers()
-
     # Display browser list and exit
+    # Detection is enough here, the browsers need not be registered
     if browser_list:
-        display_registered_browsers()
+        display_registered_browsers(
+            {
+                name: path
+                for name, path in get_installed_browsers().items()
+                if path
+            }
+        )
         return
 
+    # Installed browsers are only needed when they may be referred to by name
+    if browser_name or p_file or not browser_path:
+        register_all_installed_browsers()
+
     # When a parameter file is passed, process accordingly
     if p_file:
         p_file_path = Path(p_file)
@@ -623,8 +1138,7 @@ def cli(browser_name, browser_path, p_file, fast, browser_list, urls, urls_):
             pass
     # When bp is specified, set to webbrowser
     if browser_path:
-        for path in browser_path:
-            register_browser(path, path)
+        register_browsers((path, path) for path in browser_path)
         browsers.extend(list(browser_path))
     # When bn is specified, check if webbrowser is configured
     if browser_name: